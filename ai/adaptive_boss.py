@@ -2,12 +2,15 @@
 import os, json
 import numpy as np
 from data.fight_data import _read_df, compute_update as regression_compute
+from ai.gp_adapter import GPAdapter
 
 class AdaptiveBoss:
     def __init__(self, cfg, state_path="ai/state.json"):
         self.cfg = cfg
         self.state_path = state_path
         self.state = {"integral": 0.0, "prev_error": 0.0}
+        self.prior = None  # pooled RunningStats from other cabinets, set by the orchestrator
+        self.gp = None
         if os.path.exists(self.state_path):
             try:
                 self.state.update(json.load(open(self.state_path, "r")))
@@ -41,9 +44,41 @@ class AdaptiveBoss:
             print(f"[adaptive_boss:PID] winrate={winrate:.3f} error={error:.3f} delta={delta:.4f}")
             return new_aggr, new_react
 
+        if mode == "GP":
+            return self._update_gp(csv_path, current_aggr, current_react)
+
         # fallback: regression-based compute (existing behavior)
         if compute_fn is None:
             compute_fn = regression_compute
-        res = compute_fn(csv_path, current_aggr, current_react, self.cfg)
+        if self.prior is not None:
+            res = compute_fn(csv_path, current_aggr, current_react, self.cfg, prior=self.prior)
+        else:
+            res = compute_fn(csv_path, current_aggr, current_react, self.cfg)
         # compute_fn returns (new_aggr, new_react, winrate)
         return res[0], res[1]
+
+    def _update_gp(self, csv_path, current_aggr, current_react):
+        df = _read_df(csv_path)
+        gp_state = self.state.get("gp", {})
+        # rows of the CSV already folded into the GP; counting rows rather than
+        # comparing whole-second timestamps keeps same-second rows from being skipped
+        rows_seen = gp_state.get("rows_seen")
+        if self.gp is None:
+            self.gp = GPAdapter(self.cfg, gp_state.get("points") if rows_seen is not None else None)
+        n_rows = 0 if df is None else len(df)
+        if rows_seen is None or n_rows < rows_seen:
+            # first GP run (or the log was rotated): seed from the most recent history
+            new = df.tail(self.gp.max_points) if n_rows else None
+        else:
+            new = df.iloc[rows_seen:].tail(self.gp.max_points)
+        if new is not None:
+            for a, r, w in new[["aggression","reaction_time","win"]].astype(float).values:
+                self.gp.add(a, r, w)
+        rows_seen = n_rows
+        if len(self.gp.y) == 0:
+            return current_aggr, current_react
+        new_aggr, new_react, mu, sd = self.gp.suggest(self.cfg.get("TARGET_WINRATE", 0.5))
+        self.state["gp"] = dict(self.gp.to_dict(), rows_seen=rows_seen)
+        self._save_state()
+        print(f"[adaptive_boss:GP] points={len(self.gp.y)} pred_winrate={mu:.3f} std={sd:.3f}")
+        return new_aggr, new_react
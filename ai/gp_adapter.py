@@ -0,0 +1,109 @@
+# ai/gp_adapter.py
+# Gaussian-process model of win probability over (aggression, reaction_time),
+# used by AdaptiveBoss when ADAPTATION_MODE is "GP".
+#
+# The observation set is capped at GP_MAX_POINTS. Its Cholesky factor is kept
+# up to date incrementally: a new match appends one row to the factor, and
+# evicting the oldest point is a rank-one update of the trailing block, so each
+# match costs O(n^2) instead of O(n^3).
+import numpy as np
+from scipy.linalg import solve_triangular
+
+def _chol_update(L, v):
+    """Return the Cholesky factor of L L^T + v v^T (rank-one update)."""
+    L = L.copy()
+    v = v.astype(float).copy()
+    n = L.shape[0]
+    for k in range(n):
+        r = np.hypot(L[k, k], v[k])
+        c = r / L[k, k]
+        s = v[k] / L[k, k]
+        L[k, k] = r
+        if k + 1 < n:
+            L[k+1:, k] = (L[k+1:, k] + s * v[k+1:]) / c
+            v[k+1:] = c * v[k+1:] - s * L[k+1:, k]
+    return L
+
+
+class GPAdapter:
+    def __init__(self, cfg, points=None):
+        self.cfg = cfg
+        self.lengthscale = cfg.get("GP_LENGTHSCALE", 0.3)   # in normalized knob units
+        self.signal_var = cfg.get("GP_SIGNAL_VAR", 0.1)
+        self.noise_var = cfg.get("GP_NOISE_VAR", 0.2)       # win/loss outcomes are Bernoulli
+        self.max_points = int(cfg.get("GP_MAX_POINTS", 60))
+        self.kappa = cfg.get("GP_KAPPA", 0.5)               # exploration weight
+        self.grid_size = int(cfg.get("GP_GRID", 41))
+        self.lo = np.array([cfg.get("MIN_AGGR", 0.0), cfg.get("MIN_REACTION", 0.1)])
+        self.hi = np.array([cfg.get("MAX_AGGR", 1.0), cfg.get("MAX_REACTION", 2.5)])
+        self.X = np.zeros((0, 2))
+        self.y = np.zeros(0)
+        self.L = np.zeros((0, 0))
+        for x in points or []:
+            self.add(x[0], x[1], x[2])
+
+    def _norm(self, X):
+        return (np.atleast_2d(X) - self.lo) / (self.hi - self.lo)
+
+    def _kernel(self, A, B):
+        d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(-1)
+        return self.signal_var * np.exp(-0.5 * d2 / self.lengthscale**2)
+
+    def add(self, aggr, react, win):
+        """Add one match outcome; evicts the oldest point once the cap is reached."""
+        if len(self.y) >= self.max_points:
+            self._remove_oldest()
+        x = self._norm([aggr, react])
+        n = len(self.y)
+        if n == 0:
+            self.L = np.array([[np.sqrt(self.signal_var + self.noise_var)]])
+        else:
+            c = solve_triangular(self.L, self._kernel(self.X, x)[:, 0], lower=True)
+            d = np.sqrt(max(self.signal_var + self.noise_var - c.dot(c), 1e-12))
+            L = np.zeros((n + 1, n + 1))
+            L[:n, :n] = self.L
+            L[n, :n] = c
+            L[n, n] = d
+            self.L = L
+        self.X = np.vstack([self.X, x])
+        self.y = np.append(self.y, float(win))
+
+    def _remove_oldest(self):
+        # K = [[l11^2, l11 l21^T], [l21 l11, l21 l21^T + L22 L22^T]]; dropping
+        # point 0 leaves K22 = L22 L22^T + l21 l21^T, a rank-one update of L22
+        l21 = self.L[1:, 0]
+        self.L = _chol_update(self.L[1:, 1:], l21)
+        self.X = self.X[1:]
+        self.y = self.y[1:]
+
+    def predict(self, Xs, normalized=False):
+        """Posterior mean and std of win probability at knob settings Xs (m x 2)."""
+        Xs = np.atleast_2d(Xs) if normalized else self._norm(Xs)
+        if len(self.y) == 0:
+            return np.full(len(Xs), 0.5), np.full(len(Xs), np.sqrt(self.signal_var))
+        m = float(self.y.mean())
+        z = solve_triangular(self.L, self.y - m, lower=True)
+        alpha = solve_triangular(self.L, z, lower=True, trans="T")
+        Ks = self._kernel(self.X, Xs)
+        mu = m + Ks.T.dot(alpha)
+        v = solve_triangular(self.L, Ks, lower=True)
+        var = np.maximum(self.signal_var - (v**2).sum(0), 1e-12)
+        return np.clip(mu, 0.0, 1.0), np.sqrt(var)
+
+    def suggest(self, target):
+        """
+        Pick the grid point whose predicted win rate is closest to target,
+        discounted by kappa * std so poorly explored regions still get tried.
+        """
+        g = np.linspace(0.0, 1.0, self.grid_size)
+        ga, gr = np.meshgrid(g, g, indexing="ij")
+        grid = np.column_stack([ga.ravel(), gr.ravel()])
+        mu, sd = self.predict(grid, normalized=True)
+        score = np.abs(mu - target) - self.kappa * sd
+        i = int(np.argmin(score))
+        aggr, react = self.lo + grid[i] * (self.hi - self.lo)
+        return float(aggr), float(react), float(mu[i]), float(sd[i])
+
+    def to_dict(self):
+        pts = self.lo + self.X * (self.hi - self.lo)
+        return {"points": [[float(a), float(r), float(w)] for (a, r), w in zip(pts, self.y)]}
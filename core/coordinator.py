@@ -0,0 +1,153 @@
+# core/coordinator.py
+# Local coordinator that merges regression statistics pushed by several cabinets.
+#
+#   python -m core.coordinator --port 5055 --state ai/global_state.json
+#
+# Protocol: one JSON object per line over TCP on localhost.
+#   {"op": "hello", "cabinet": "cab1"}  -> last acknowledged seq / through_ts for that cabinet
+#   {"op": "push", "cabinet": "cab1", "seq": 3, "through_ts": 1760039004,
+#    "delta": <RunningStats.to_dict()>}   (a seq already seen is acked but not merged again)
+#   {"op": "pull", "cabinet": "cab1"}   -> prior merged over every *other* cabinet
+#   {"op": "status"}
+import os, json, time, socket, socketserver, threading, argparse
+from data.running_stats import RunningStats
+from data.fight_data import REG_COLUMNS
+
+def send_msg(sock_file, obj):
+    data = (json.dumps(obj) + "\n").encode("utf-8")
+    sock_file.write(data)
+    sock_file.flush()
+    return len(data)
+
+def request(host, port, msg, timeout=2.0):
+    """Send one message and read one reply. Returns (reply, bytes_sent, bytes_recv)."""
+    with socket.create_connection((host, port), timeout=timeout) as s:
+        f = s.makefile("rwb")
+        sent = send_msg(f, msg)
+        line = f.readline()
+    if not line:
+        raise ConnectionError("coordinator closed connection")
+    return json.loads(line), sent, len(line)
+
+
+class Coordinator:
+    def __init__(self, host="127.0.0.1", port=5055, state_path=None):
+        self.host = host
+        self.port = port
+        self.state_path = state_path
+        self.cabinets = {}      # cabinet id -> RunningStats of everything it pushed
+        self.last_seen = {}     # cabinet id -> unix time of last push
+        self.seqs = {}          # cabinet id -> last merged push seq
+        self.through = {}       # cabinet id -> newest CSV timestamp included in its pushes
+        self.version = 0
+        self.bytes_in = 0
+        self.lock = threading.Lock()
+        self._server = None
+        if state_path and os.path.exists(state_path):
+            try:
+                d = json.load(open(state_path, "r"))
+                self.cabinets = {k: RunningStats.from_dict(v) for k, v in d.get("cabinets", {}).items()}
+                self.version = int(d.get("version", 0))
+                self.seqs = {k: int(v) for k, v in d.get("seqs", {}).items()}
+                self.through = d.get("through", {})
+            except Exception as e:
+                print("[coordinator] could not load state:", e)
+
+    def handle(self, msg):
+        op = msg.get("op")
+        cab = str(msg.get("cabinet", ""))
+        if op == "hello":
+            with self.lock:
+                return {"ok": True, "version": self.version,
+                        "last_seq": self.seqs.get(cab, 0), "through_ts": self.through.get(cab)}
+        if op == "push":
+            delta = RunningStats.from_dict(msg["delta"])
+            if delta.columns != REG_COLUMNS:
+                raise ValueError(f"delta columns must be {REG_COLUMNS}")
+            seq = msg.get("seq")
+            with self.lock:
+                self.last_seen[cab] = time.time()
+                if seq is not None and int(seq) <= self.seqs.get(cab, 0):
+                    # retry of a push we already merged (client missed the reply)
+                    return {"ok": True, "version": self.version, "seq": int(seq), "duplicate": True}
+                cur = self.cabinets.get(cab)
+                self.cabinets[cab] = delta if cur is None else cur.merge(delta)
+                if seq is not None:
+                    self.seqs[cab] = int(seq)
+                ts = msg.get("through_ts")
+                if ts is not None:
+                    self.through[cab] = max(ts, self.through.get(cab) or ts)
+                self.version += 1
+                version = self.version
+                self._save_state()
+            return {"ok": True, "version": version, "seq": seq}
+        if op == "pull":
+            with self.lock:
+                prior = RunningStats(REG_COLUMNS)
+                for k, s in self.cabinets.items():
+                    if k != cab:
+                        prior.merge(s)
+                version = self.version
+            return {"ok": True, "version": version, "time": time.time(), "prior": prior.to_dict()}
+        if op == "status":
+            with self.lock:
+                return {"ok": True, "version": self.version, "bytes_in": self.bytes_in,
+                        "cabinets": {k: {"n": s.n, "last_seen": self.last_seen.get(k),
+                                         "last_seq": self.seqs.get(k, 0)}
+                                     for k, s in self.cabinets.items()}}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        d = os.path.dirname(self.state_path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": self.version, "seqs": self.seqs, "through": self.through,
+                       "cabinets": {k: s.to_dict() for k, s in self.cabinets.items()}}, f)
+        os.replace(tmp, self.state_path)
+
+    def serve(self, block=True):
+        coord = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    with coord.lock:
+                        coord.bytes_in += len(line)
+                    try:
+                        reply = coord.handle(json.loads(line))
+                    except Exception as e:
+                        reply = {"ok": False, "error": str(e)}
+                    send_msg(self.wfile, reply)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        print(f"[coordinator] listening on {self.host}:{self.port}")
+        if block:
+            self._server.serve_forever()
+        else:
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="BossForge multi-cabinet coordinator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--state", default="ai/global_state.json")
+    args = ap.parse_args()
+    try:
+        Coordinator(args.host, args.port, args.state).serve()
+    except KeyboardInterrupt:
+        print("Stopped by user.")
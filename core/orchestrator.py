@@ -1,20 +1,46 @@
 # core/orchestrator.py (Enhanced with Manual Input)
 import time
 from engine.cns_manager import read_params, write_params
-from engine.mugen_runner import MugenRunner
+from engine.mugen_runner import MugenRunner, READY_PATTERN
 from engine.log_parser import parse_winner
-from engine.input_manager import InputCounter
 from data.fight_data import append_row, compute_update
 from ai.adaptive_boss import AdaptiveBoss
+from core.sync_client import SyncClient
 
 class Orchestrator:
-    def __init__(self, cfg, paths, auto_mode=False):
+    def __init__(self, cfg, paths, auto_mode=False, input_counter=None):
         self.cfg = cfg
         self.paths = paths
-        self.runner = MugenRunner(paths["MUGEN_EXE"], paths["MUGEN_WORKDIR"])
+        self.runner = MugenRunner(
+            paths["MUGEN_EXE"],
+            paths["MUGEN_WORKDIR"],
+            timeout=cfg.get("MATCH_TIMEOUT"),
+            log_path=paths.get("LOG_PATH"),
+            ready_pattern=cfg.get("MUGEN_READY_PATTERN", READY_PATTERN),
+            prefetch=cfg.get("PREFETCH_ASSETS", True),
+        )
         self.ai = AdaptiveBoss(cfg)
-        self.ic = InputCounter("config/settings.yaml")
+        if input_counter is None:
+            # pynput needs a display, so only import it when actually counting keys
+            from engine.input_manager import InputCounter
+            input_counter = InputCounter("config/settings.yaml")
+        self.ic = input_counter
         self.auto_mode = auto_mode  # If True, always default to P2 win
+
+        # Optional multi-cabinet sync (see core/coordinator.py)
+        self.sync = None
+        if cfg.get("SYNC_ENABLED", False):
+            mode = cfg.get("ADAPTATION_MODE", "PID").upper()
+            if mode in ("PID", "GP"):
+                print(f"[sync] warning: ADAPTATION_MODE {mode} ignores the pooled prior; "
+                      "only the regression mode uses it (rows are still shared)")
+            self.sync = SyncClient(
+                cfg.get("CABINET_ID", "cabinet"),
+                cfg.get("SYNC_HOST", "127.0.0.1"),
+                cfg.get("SYNC_PORT", 5055),
+                cfg.get("SYNC_INTERVAL", 5.0),
+                csv_path=paths["FIGHT_LOGS_CSV"],
+            ).start()
         
         # Track statistics
         self.total_matches = 0
@@ -42,6 +68,9 @@ class Orchestrator:
         # Stop input counter
         self.ic.stop()
 
+        if not self._should_record(self.runner.last):
+            return
+
         attack_inputs = int(self.ic.count)
         attack_rate = attack_inputs / max(0.001, fight_time)
 
@@ -57,6 +86,8 @@ class Orchestrator:
                                attack_inputs, attack_rate, fight_time)
         
         # Update AI parameters
+        if self.sync is not None:
+            self.ai.prior = self.sync.prior()
         new_aggr, new_react = self.ai.update(
             self.paths["FIGHT_LOGS_CSV"], 
             current_aggr, 
@@ -70,6 +101,32 @@ class Orchestrator:
         
         print("\n  Press Ctrl+C anytime to stop training...\n")
 
+    def _should_record(self, last):
+        """
+        Decide whether the match just played gets a CSV row and an AI update.
+        Killed or failed matches never do: the log would still hold the
+        previous match's winner.
+        """
+        if last.get("timed_out"):
+            print("  Match was killed by the watchdog; not recording it.\n")
+            return False
+        if last.get("failed"):
+            print("  M.U.G.E.N. failed to launch or exited with an error; not recording it.\n")
+            return False
+        if not last.get("startup_detected"):
+            if self.cfg.get("DROP_UNTIMED_MATCHES", False):
+                print("  Round start never appeared in the log (check MUGEN_READY_PATTERN); "
+                      "not recording it.\n")
+                return False
+            print("  [runner] round start not found in log; fight time includes engine startup")
+        return True
+
+    def close(self):
+        """Flush rows still queued for the coordinator before exiting."""
+        if self.sync is not None:
+            self.sync.stop(flush=True)
+            self.sync = None
+
     def _ask_user_for_winner(self):
         """
         Ask user who won the match.
@@ -125,6 +182,9 @@ class Orchestrator:
             "win": int(win)
         }
         append_row(self.paths["FIGHT_LOGS_CSV"], row)
+        if self.sync is not None:
+            self.sync.push(row)
+            self.sync.flush()
         
         winner_text = "🎉 PLAYER 1 (YOU)" if win == 1 else "💀 PLAYER 2 (BOSS)"
         
@@ -133,6 +193,9 @@ class Orchestrator:
         print(f"  {'─'*70}")
         print(f"  Winner:         {winner_text}")
         print(f"  Fight Duration: {fight_time:.2f}s")
+        startup = self.runner.last.get("startup_time")
+        if startup is not None:
+            print(f"  Engine Startup: {startup:.2f}s")
         print(f"  Your Attacks:   {attack_inputs} inputs ({attack_rate:.2f}/s)")
         print(f"  {'─'*70}")
 
@@ -158,4 +221,11 @@ class Orchestrator:
         print(f"  Boss Wins (P2):    {self.p2_wins:3d}  ({p2_winrate:5.1f}%)  {'█' * int(p2_winrate/5)}")
         print(f"  {'─'*70}")
         print(f"  {trend}")
+        if self.sync is not None:
+            st = self.sync.stats()
+            stale = "never" if st["staleness_s"] is None else f"{st['staleness_s']:.1f}s ago"
+            print(f"  {'─'*70}")
+            print(f"  Sync [{st['cabinet']}]: v{st['global_version']}  prior={st['prior_rows']} rows  "
+                  f"pulled {stale}  sent={st['bytes_sent']}B recv={st['bytes_recv']}B  "
+                  f"pending={st['pending_rows']}")
         print(f"{'='*70}")
\ No newline at end of file
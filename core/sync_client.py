@@ -0,0 +1,183 @@
+# core/sync_client.py
+# Cabinet-side half of the federated sync: batches local match rows into a
+# RunningStats delta and exchanges it with core/coordinator.py on a background
+# thread, so the match loop never waits on the socket.
+#
+# Every push carries a per-cabinet seq. A batch that was sent but not
+# acknowledged is resent unchanged under the same seq, and the coordinator
+# drops seqs it has already merged, so a lost reply never double-counts.
+# With csv_path set, the first sync also pushes the existing history; a marker
+# file (and the coordinator's through_ts) records how far the CSV was pushed.
+import os, json, time, threading
+from data.running_stats import RunningStats
+from data.fight_data import REG_COLUMNS, _read_df
+from core.coordinator import request
+
+class SyncClient:
+    def __init__(self, cabinet_id, host="127.0.0.1", port=5055, interval=5.0, timeout=2.0,
+                 csv_path=None, marker_path=None):
+        self.cabinet_id = str(cabinet_id)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.timeout = timeout
+        self.csv_path = csv_path
+        if marker_path is None and csv_path:
+            marker_path = os.path.splitext(csv_path)[0] + ".sync.json"
+        self.marker_path = marker_path
+        self.lock = threading.Lock()
+        self.pending = RunningStats(REG_COLUMNS)   # rows not yet handed to a push
+        self.pending_ts = None      # newest timestamp in pending
+        self.inflight = None        # (seq, RunningStats, through_ts) sent but not acknowledged
+        self.seq = 0
+        self.through_ts = self._load_marker()
+        self.ready = False          # handshake with the coordinator done
+        self.global_prior = None
+        self.global_version = 0
+        self.last_pull = None       # unix time of last successful pull
+        self.bytes_sent = 0
+        self.bytes_recv = 0
+        self.pushes = 0
+        self.duplicates = 0
+        self.errors = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            # no join timeout: a sync in progress must finish before the flush
+            # below touches inflight/through_ts; each request is socket-bounded
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.sync_once()
+
+    def push(self, row):
+        """Queue one match row (dict) for the next batch. Never blocks on the network."""
+        with self.lock:
+            self.pending.push(row)
+            ts = row.get("timestamp")
+            if ts is not None:
+                self.pending_ts = ts if self.pending_ts is None else max(self.pending_ts, ts)
+
+    def flush(self):
+        """Ask the background thread to sync now instead of waiting for the interval."""
+        self._wake.set()
+
+    def prior(self):
+        """Latest merged prior from the other cabinets (RunningStats) or None."""
+        with self.lock:
+            return None if self.global_prior is None else self.global_prior.copy()
+
+    def _load_marker(self):
+        if self.marker_path and os.path.exists(self.marker_path):
+            try:
+                return json.load(open(self.marker_path, "r")).get("through_ts")
+            except Exception as e:
+                print("[sync] could not read marker:", e)
+        return None
+
+    def _save_marker(self):
+        if not self.marker_path or self.through_ts is None:
+            return
+        tmp = self.marker_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"cabinet": self.cabinet_id, "through_ts": self.through_ts}, f)
+        os.replace(tmp, self.marker_path)
+
+    def _call(self, msg):
+        reply, sent, recv = request(self.host, self.port, msg, self.timeout)
+        with self.lock:
+            self.bytes_sent += sent
+            self.bytes_recv += recv
+        return reply
+
+    def _handshake(self):
+        reply = self._call({"op": "hello", "cabinet": self.cabinet_id})
+        with self.lock:
+            self.seq = max(self.seq, int(reply.get("last_seq", 0)))
+            server_ts = reply.get("through_ts")
+            if server_ts is not None and (self.through_ts is None or server_ts > self.through_ts):
+                self.through_ts = server_ts
+            if self.csv_path:
+                # the CSV holds every row (append_row runs before push), so rebuild
+                # pending from whatever it has past the marker, history included
+                df = _read_df(self.csv_path)
+                if df is not None and self.through_ts is not None:
+                    df = df[df["timestamp"] > self.through_ts]
+                if df is not None and len(df):
+                    self.pending = RunningStats.from_frame(df, REG_COLUMNS)
+                    self.pending_ts = int(df["timestamp"].max())
+                else:
+                    self.pending = RunningStats(REG_COLUMNS)
+                    self.pending_ts = None
+            self.ready = True
+        self._save_marker()
+
+    def sync_once(self):
+        try:
+            if not self.ready:
+                self._handshake()
+            with self.lock:
+                if self.inflight is None and self.pending.n > 0:
+                    self.seq += 1
+                    self.inflight = (self.seq, self.pending, self.pending_ts)
+                    self.pending, self.pending_ts = RunningStats(REG_COLUMNS), None
+                inflight = self.inflight
+            if inflight is not None:
+                seq, batch, ts = inflight
+                reply = self._call({"op": "push", "cabinet": self.cabinet_id, "seq": seq,
+                                    "through_ts": ts, "delta": batch.to_dict()})
+                if not reply.get("ok"):
+                    raise RuntimeError(reply.get("error", "push rejected"))
+                with self.lock:
+                    self.inflight = None
+                    self.pushes += 1
+                    if reply.get("duplicate"):
+                        self.duplicates += 1
+                    if ts is not None:
+                        self.through_ts = ts if self.through_ts is None else max(self.through_ts, ts)
+                self._save_marker()
+            reply = self._call({"op": "pull", "cabinet": self.cabinet_id})
+            with self.lock:
+                if reply.get("ok"):
+                    self.global_prior = RunningStats.from_dict(reply["prior"])
+                    self.global_version = int(reply["version"])
+                    self.last_pull = time.time()
+            return True
+        except Exception as e:
+            # an unacknowledged batch stays in self.inflight and is resent as-is
+            with self.lock:
+                self.errors += 1
+            print("[sync] coordinator unreachable:", e)
+            return False
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.sync_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "cabinet": self.cabinet_id,
+                "bytes_sent": self.bytes_sent,
+                "bytes_recv": self.bytes_recv,
+                "pushes": self.pushes,
+                "duplicates": self.duplicates,
+                "errors": self.errors,
+                "pending_rows": self.pending.n + (self.inflight[1].n if self.inflight else 0),
+                "global_version": self.global_version,
+                "prior_rows": 0 if self.global_prior is None else self.global_prior.n,
+                "staleness_s": None if self.last_pull is None else time.time() - self.last_pull,
+            }
@@ -1,7 +1,10 @@
 # data/fight_data.py
 import os, csv, pandas as pd, numpy as np
+from data.running_stats import RunningStats, stats_path, load_stats, save_stats
 
 COLUMNS = ["timestamp","aggression","reaction_time","attack_inputs","attack_rate","fight_time","win"]
+# regression inputs followed by the target; shared with the multi-cabinet sync
+REG_COLUMNS = ["aggression","reaction_time","attack_rate","fight_time","win"]
 
 def append_row(csv_path, row):
     newfile = not os.path.exists(csv_path)
@@ -11,6 +14,50 @@ def append_row(csv_path, row):
         if newfile:
             writer.writeheader()
         writer.writerow(row)
+    update_stats(csv_path, row, newfile=newfile)
+
+def update_stats(csv_path, row, newfile=False):
+    """Fold one appended row into the running summary kept next to the CSV."""
+    path = stats_path(csv_path)
+    if newfile:
+        # fresh log: any sidecar left over from a deleted/rotated CSV is stale
+        stats = RunningStats().push(row)
+    else:
+        stats = load_stats(path)
+        if stats is None:
+            # first run against an existing log, or a corrupt sidecar: seed from
+            # the full history (which already holds this row)
+            return _rebuild_stats(csv_path)
+        stats.push(row)
+    save_stats(path, stats)
+    return stats
+
+def _rebuild_stats(csv_path, write=True):
+    df = _read_df(csv_path)
+    stats = RunningStats.from_frame(df) if df is not None else RunningStats()
+    if write:
+        save_stats(stats_path(csv_path), stats)
+    return stats
+
+def _count_rows(csv_path):
+    # line count without parsing; the header is not a row
+    with open(csv_path, "rb") as f:
+        return max(0, sum(1 for line in f if line.strip()) - 1)
+
+def read_stats(csv_path, write=True):
+    """
+    Running summary for the whole log, rebuilt from the CSV if the sidecar is
+    missing, unreadable, older than the CSV or counts a different number of rows.
+    With write=False a rebuilt summary is not saved back next to the log.
+    """
+    path = stats_path(csv_path)
+    if not os.path.exists(csv_path):
+        return RunningStats()
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+        stats = load_stats(path)
+        if stats is not None and stats.n == _count_rows(csv_path):
+            return stats
+    return _rebuild_stats(csv_path, write)
 
 def _read_df(csv_path):
     if not os.path.exists(csv_path):
@@ -26,8 +73,54 @@ def _read_df(csv_path):
     df["win"] = pd.to_numeric(df["win"].fillna(0), errors='coerce').fillna(0).astype(int)
     return df
 
-def compute_update(csv_path, current_aggr, current_react, cfg):
+def regression_from_stats(stats):
+    """
+    Least-squares win ~ 1 + aggression + reaction_time + attack_rate + fight_time
+    solved from a RunningStats summary over REG_COLUMNS (same fit as lstsq on the rows).
+    """
+    cov = stats.m2
+    beta_x, *_ = np.linalg.lstsq(cov[:-1, :-1], cov[:-1, -1], rcond=None)
+    intercept = stats.mean[-1] - stats.mean[:-1].dot(beta_x)
+    return np.concatenate([[intercept], beta_x])
+
+def _gradient_step(beta, current_aggr, current_react, mean_attack_rate, mean_fight_time, cfg):
+    x_curr = np.array([1.0, current_aggr, current_react, mean_attack_rate, mean_fight_time])
+    pred = float(x_curr.dot(beta))
+    beta_aggr = float(beta[1]) if len(beta) > 1 else 0.0
+    beta_react = float(beta[2]) if len(beta) > 2 else 0.0
+    denom = beta_aggr**2 + beta_react**2 + 1e-9
+    factor = cfg["LEARNING_RATE"] * (cfg["TARGET_WINRATE"] - pred) / denom
+    delta_aggr = factor * beta_aggr
+    delta_react = factor * beta_react
+    new_aggr = np.clip(current_aggr + delta_aggr, cfg["MIN_AGGR"], cfg["MAX_AGGR"])
+    new_react = np.clip(current_react + delta_react, cfg["MIN_REACTION"], cfg["MAX_REACTION"])
+    return new_aggr, new_react
+
+def compute_update(csv_path, current_aggr, current_react, cfg, prior=None):
+    """
+    prior: optional RunningStats over REG_COLUMNS pooled from other cabinets
+    (see core/sync_client.py). It is down-weighted to at most SYNC_PRIOR_WEIGHT
+    rows and merged with the local window, so a cold cabinet starts from the
+    shared fit while its own players take over as the window fills.
+    """
     df = _read_df(csv_path)
+    if prior is not None and prior.n > 0:
+        dfw = df.tail(cfg["WINDOW"]) if df is not None else None
+        local = RunningStats.from_frame(dfw, REG_COLUMNS) if dfw is not None else RunningStats(REG_COLUMNS)
+        merged = prior.downweighted(cfg.get("SYNC_PRIOR_WEIGHT", 30)) + local
+        if merged.n >= 8:
+            try:
+                beta = regression_from_stats(merged)
+            except Exception as e:
+                print("[fight_data] pooled regression failed:", e)
+            else:
+                # operating point comes from this cabinet's own recent matches
+                means = local if local.n > 0 else merged
+                new_aggr, new_react = _gradient_step(beta, current_aggr, current_react,
+                                                     float(means.mean[2]), float(means.mean[3]), cfg)
+                win_rate = float(means.mean[-1])
+                return new_aggr, new_react, win_rate
+
     if df is None or len(df) == 0:
         return current_aggr, current_react, 0.0
 
@@ -54,14 +147,6 @@ def compute_update(csv_path, current_aggr, current_react, cfg):
 
     mean_attack_rate = float(dfw['attack_rate'].mean()) if 'attack_rate' in dfw else 0.0
     mean_fight_time = float(dfw['fight_time'].mean()) if 'fight_time' in dfw else 1.0
-    x_curr = np.array([1.0, current_aggr, current_react, mean_attack_rate, mean_fight_time])
-    pred = float(x_curr.dot(beta))
-    beta_aggr = float(beta[1]) if len(beta) > 1 else 0.0
-    beta_react = float(beta[2]) if len(beta) > 2 else 0.0
-    denom = beta_aggr**2 + beta_react**2 + 1e-9
-    factor = cfg["LEARNING_RATE"] * (cfg["TARGET_WINRATE"] - pred) / denom
-    delta_aggr = factor * beta_aggr
-    delta_react = factor * beta_react
-    new_aggr = np.clip(current_aggr + delta_aggr, cfg["MIN_AGGR"], cfg["MAX_AGGR"])
-    new_react = np.clip(current_react + delta_react, cfg["MIN_REACTION"], cfg["MAX_REACTION"])
+    new_aggr, new_react = _gradient_step(beta, current_aggr, current_react,
+                                         mean_attack_rate, mean_fight_time, cfg)
     return new_aggr, new_react, float(dfw['win'].mean())
@@ -0,0 +1,147 @@
+# data/running_stats.py
+import os, json
+import numpy as np
+
+STATS_COLUMNS = ["aggression","reaction_time","attack_inputs","attack_rate","fight_time","win"]
+
+class RunningStats:
+    """
+    Streaming mean / variance / covariance over a fixed set of columns.
+
+    Uses Welford updates for single rows and the Chan et al. pairwise
+    formula to merge partial states, so per-segment or per-cabinet
+    summaries combine exactly. Memory and query cost are O(columns^2)
+    no matter how many matches have been seen.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns or STATS_COLUMNS)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros((k, k))  # sum of outer products of deviations
+
+    def push(self, row):
+        """Add one observation (dict keyed by column, or sequence in column order)."""
+        if isinstance(row, dict):
+            x = np.array([float(row.get(c, 0.0)) for c in self.columns])
+        else:
+            x = np.asarray(row, dtype=float)
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += np.outer(d, x - self.mean)
+        return self
+
+    def push_many(self, X):
+        """Add a block of rows at once (vectorized, then merged)."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[0] == 0:
+            return self
+        block = RunningStats(self.columns)
+        block.n = X.shape[0]
+        block.mean = X.mean(axis=0)
+        D = X - block.mean
+        block.m2 = D.T @ D
+        return self.merge(block)
+
+    def merge(self, other):
+        """Fold another partial state into this one in place."""
+        if other.columns != self.columns:
+            raise ValueError("cannot merge RunningStats over different columns")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean.copy(), other.m2.copy()
+            return self
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + np.outer(d, d) * (self.n * other.n / n)
+        self.mean = self.mean + d * (other.n / n)
+        self.n = n
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def copy(self):
+        s = RunningStats(self.columns)
+        s.n, s.mean, s.m2 = self.n, self.mean.copy(), self.m2.copy()
+        return s
+
+    def downweighted(self, max_n):
+        """
+        Copy whose effective count is at most max_n. Mean and covariance are
+        kept; only the weight this summary carries in a merge shrinks.
+        """
+        s = self.copy()
+        if s.n > max_n:
+            s.m2 = s.m2 * (max_n / s.n)
+            s.n = max_n
+        return s
+
+    def cov(self, ddof=1):
+        if self.n <= ddof:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.n - ddof)
+
+    def var(self, ddof=1):
+        return np.diag(self.cov(ddof))
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+    def corr(self):
+        """Pearson correlation; constant columns give NaN like pandas."""
+        d = np.sqrt(np.diag(self.m2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = self.m2 / np.outer(d, d)
+        c[np.outer(d, d) == 0] = np.nan
+        return c
+
+    def get(self, column):
+        """(mean, variance) for a single column."""
+        i = self.columns.index(column)
+        return float(self.mean[i]), float(self.var()[i])
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        columns = [c for c in (columns or STATS_COLUMNS) if c in df.columns]
+        s = cls(columns)
+        if len(df):
+            s.push_many(df[columns].astype(float).values)
+        return s
+
+    def to_dict(self):
+        return {"columns": self.columns, "n": self.n,
+                "mean": self.mean.tolist(), "m2": self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls(d["columns"])
+        s.n = d["n"]
+        s.mean = np.asarray(d["mean"], dtype=float)
+        s.m2 = np.asarray(d["m2"], dtype=float)
+        return s
+
+
+def stats_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".stats.json"
+
+def load_stats(path):
+    """Summary saved at path, or None if it is missing or unreadable."""
+    if os.path.exists(path):
+        try:
+            return RunningStats.from_dict(json.load(open(path, "r")))
+        except Exception as e:
+            print("[running_stats] could not load", path, e)
+    return None
+
+def save_stats(path, stats):
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(stats.to_dict(), f)
+    os.replace(tmp, path)
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import os
+import os, sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.running_stats import RunningStats
+from data.fight_data import read_stats
+
 # ======================
 # 🎮 CONFIGURATION
 # ======================
@@ -28,6 +32,16 @@ def load_data(path):
     df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", errors="coerce")
     return df
 
+@st.cache_data
+def load_summary(path):
+    # cached together with load_data so the heatmap describes the same rows;
+    # the sidecar is only read, never written, and is ignored if it disagrees
+    df = load_data(path)
+    stats = read_stats(path, write=False) if os.path.exists(path) else RunningStats()
+    if stats.n != len(df):
+        stats = RunningStats.from_frame(df)
+    return stats
+
 df = load_data(FIGHT_LOG_PATH)
 
 if df.empty:
@@ -54,6 +68,8 @@ time_range = st.sidebar.slider(
     format="YYYY-MM-DD HH:mm:ss"
 )
 
+full_range = (time_range[0] == time_min and time_range[1] == time_max)
+
 # Filter dataframe
 df = df[(df["timestamp"] >= pd.Timestamp(time_range[0])) & (df["timestamp"] <= pd.Timestamp(time_range[1]))]
 
@@ -110,7 +126,10 @@ with tab1:
 with tab2:
     st.subheader("📉 Correlation Heatmap")
     import plotly.figure_factory as ff
-    corr = df.corr(numeric_only=True)
+    # full range reuses the cached running summary (O(columns^2));
+    # a narrowed range only summarises the filtered rows
+    stats = load_summary(FIGHT_LOG_PATH) if full_range else RunningStats.from_frame(df)
+    corr = pd.DataFrame(stats.corr(), index=stats.columns, columns=stats.columns)
     fig = ff.create_annotated_heatmap(
         z=corr.values,
         x=list(corr.columns),
@@ -1,21 +1,171 @@
-import subprocess, time, os
+import subprocess, time, os, re, glob, threading
+
+P1_DEF = "chars/kfm/kfm.def"
+P2_DEF = "chars/BossForge/BossForge.def"
+STAGE = "kfm.def"
+# a log line that starts with "Round 1"; loading lines such as
+# "Loading data/fight.def" must not end the startup phase
+READY_PATTERN = r"^\s*round\s*1\b"
+
+def prefetch_files(paths, max_bytes=512 * 1024 * 1024, chunk=1024 * 1024):
+    """
+    Pull files into the OS page cache so the next launch reads them warm.
+    Uses posix_fadvise(WILLNEED) where available, otherwise reads the file
+    through once. Returns the number of bytes touched.
+    """
+    total = 0
+    for p in paths:
+        if total >= max_bytes:
+            break
+        try:
+            size = os.path.getsize(p)
+            with open(p, "rb") as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                else:
+                    while f.read(chunk):
+                        pass
+            total += size
+        except OSError:
+            continue
+    return total
+
 
 class MugenRunner:
-    def __init__(self, exe_path, workdir):
+    def __init__(self, exe_path, workdir, timeout=None, log_path=None,
+                 ready_pattern=READY_PATTERN, prefetch=True):
         self.exe = exe_path
         self.workdir = workdir
+        self.timeout = timeout          # seconds before the watchdog kills the engine (None = no limit)
+        self.log_path = log_path        # mugen.log, watched to split startup from fight time
+        self.ready_re = re.compile(ready_pattern, re.I | re.M) if ready_pattern else None
+        self.prefetch = prefetch
+        self.last = {}                  # timings and outcome flags of the most recent match
+        self.prefetch_bytes = 0         # last background prefetch, kept apart from per-match stats
+        self.prefetch_time = 0.0
+        self._prefetch_thread = None
+        if self.prefetch:
+            self.start_prefetch()
+
+    def command(self):
+        return [
+            self.exe,
+            "-p1", P1_DEF,
+            "-p2", P2_DEF,
+            "-p2.ai", "1",
+            "-rounds", "2",
+            "-s", STAGE
+        ]
+
+    def asset_paths(self):
+        """Character, stage and sound files the next match will load."""
+        w = self.workdir
+        files = [self.exe]
+        for d in (os.path.dirname(P1_DEF), os.path.dirname(P2_DEF), "sound"):
+            for root, _, names in os.walk(os.path.join(w, d)):
+                files.extend(os.path.join(root, n) for n in names)
+        stem = os.path.splitext(STAGE)[0]
+        files.extend(glob.glob(os.path.join(w, "stages", stem + ".*")))
+        return files
+
+    def start_prefetch(self):
+        """Warm the page cache on a background thread; no-op if one is still running."""
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+        def work():
+            t = time.time()
+            self.prefetch_bytes = prefetch_files(self.asset_paths())
+            self.prefetch_time = time.time() - t
+        self._prefetch_thread = threading.Thread(target=work, daemon=True)
+        self._prefetch_thread.start()
+
+    def _log_size(self):
+        try:
+            return os.path.getsize(self.log_path) if self.log_path else None
+        except OSError:
+            return 0
+
+    def _log_ready(self, offset):
+        """Check log text written since offset for the ready pattern. Returns (ready, new_offset)."""
+        size = self._log_size()
+        if size is None or self.ready_re is None:
+            return False, offset
+        if size < offset:       # engine truncated the log on launch
+            offset = 0
+        if size == offset:
+            return False, offset
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return False, offset
+        # only consume complete lines so a marker split across two polls is not missed
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            return False, offset
+        text = data[:cut].decode("utf-8", errors="ignore")
+        return bool(self.ready_re.search(text)), offset + cut
+
+    def _kill(self, proc):
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
 
     def run_match(self):
+        """
+        Launch one match under a watchdog and return the fight duration in seconds.
+
+        Engine startup (launch until the ready pattern shows up in the log) is
+        excluded from the returned time and reported in self.last alongside the
+        total wall time. Flags in self.last: timed_out (watchdog fired), failed
+        (launch error or non-zero exit) and startup_detected. When no round-start
+        line is seen (or no log/pattern is configured) the returned time is the
+        total wall time and startup_detected stays False.
+        """
+        self.last = {"startup_time": None, "startup_detected": False, "total_time": 0.0,
+                     "timed_out": False, "failed": False}
+        offset = self._log_size() or 0
         start = time.time()
+        ready_at = None
         try:
-            subprocess.run([
-                self.exe,
-                "-p1", "chars/kfm/kfm.def",
-                "-p2", "chars/BossForge/BossForge.def",
-                "-p2.ai", "1",
-                "-rounds", "2",
-                "-s", "kfm.def"
-            ], cwd=self.workdir, check=True)
+            proc = subprocess.Popen(self.command(), cwd=self.workdir)
         except Exception as e:
             print("[error] launching M.U.G.E.N.:", e)
-        return max(0.01, time.time() - start)
+            self.last["failed"] = True
+            self.last["total_time"] = time.time() - start
+            return 0.01
+        try:
+            while proc.poll() is None:
+                now = time.time()
+                if ready_at is None:
+                    ready, offset = self._log_ready(offset)
+                    if ready:
+                        ready_at = now
+                        # assets for the next match load while this one plays out
+                        if self.prefetch:
+                            self.start_prefetch()
+                if self.timeout and now - start > self.timeout:
+                    print(f"[runner] match exceeded {self.timeout}s, killing M.U.G.E.N.")
+                    self.last["timed_out"] = True
+                    self._kill(proc)
+                    break
+                time.sleep(0.1)
+            if proc.returncode not in (0, None) and not self.last["timed_out"]:
+                print("[error] M.U.G.E.N. exited with code", proc.returncode)
+                self.last["failed"] = True
+        except KeyboardInterrupt:
+            self._kill(proc)
+            raise
+        end = time.time()
+        if self.prefetch:
+            self.start_prefetch()
+        self.last["total_time"] = end - start
+        if ready_at is not None:
+            self.last["startup_time"] = ready_at - start
+            self.last["startup_detected"] = True
+            return max(0.01, end - ready_at)
+        return max(0.01, end - start)
@@ -13,3 +13,5 @@ try:
         time.sleep(1)
 except KeyboardInterrupt:
     print("Stopped by user.")
+finally:
+    orc.close()
@@ -0,0 +1,39 @@
+# tests/test_adaptive_boss.py
+import numpy as np
+from ai.adaptive_boss import AdaptiveBoss
+from data.fight_data import append_row
+
+CFG = {"ADAPTATION_MODE": "GP", "TARGET_WINRATE": 0.5, "MIN_AGGR": 0.0, "MAX_AGGR": 1.0,
+       "MIN_REACTION": 0.1, "MAX_REACTION": 2.5, "GP_MAX_POINTS": 60, "GP_GRID": 21}
+
+def row(ts, aggr, react, win):
+    return {"timestamp": ts, "aggression": aggr, "reaction_time": react, "attack_inputs": 0,
+            "attack_rate": 0.0, "fight_time": 60.0, "win": win}
+
+def test_gp_mode_adds_each_row_once_and_reloads(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    state_path = str(tmp_path / "state.json")
+    rng = np.random.default_rng(0)
+    for i in range(5):
+        append_row(csv_path, row(1000 + 60 * i, rng.random(), 0.1 + 2.4 * rng.random(), i % 2))
+
+    boss = AdaptiveBoss(CFG, state_path)
+    boss.update(csv_path, 0.5, 1.0)
+    assert len(boss.gp.y) == 5
+
+    # same whole second as the previous row: must still be picked up, once
+    append_row(csv_path, row(1000 + 60 * 4, 0.9, 0.3, 1))
+    suggestion = boss.update(csv_path, 0.5, 1.0)
+    assert len(boss.gp.y) == 6
+    assert np.allclose(boss.gp.X[-1], boss.gp._norm([0.9, 0.3])[0])
+    assert boss.gp.y[-1] == 1.0
+
+    # no new rows: nothing is added again
+    assert boss.update(csv_path, 0.5, 1.0) == suggestion
+    assert len(boss.gp.y) == 6
+
+    reloaded = AdaptiveBoss(CFG, state_path)
+    assert reloaded.update(csv_path, 0.5, 1.0) == suggestion
+    assert len(reloaded.gp.y) == 6
+    assert np.allclose(reloaded.gp.L, boss.gp.L)
+    assert reloaded.gp.suggest(0.5) == boss.gp.suggest(0.5)
@@ -0,0 +1,31 @@
+# tests/test_gp_adapter.py
+import numpy as np
+from ai.gp_adapter import GPAdapter
+
+CFG = {"MIN_AGGR": 0.0, "MAX_AGGR": 1.0, "MIN_REACTION": 0.1, "MAX_REACTION": 2.5,
+       "GP_MAX_POINTS": 15}
+
+def test_incremental_cholesky_matches_kernel_after_eviction():
+    gp = GPAdapter(CFG)
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        gp.add(rng.random(), 0.1 + 2.4 * rng.random(), rng.integers(2))
+    assert len(gp.y) == CFG["GP_MAX_POINTS"]
+    K = gp._kernel(gp.X, gp.X) + gp.noise_var * np.eye(len(gp.y))
+    assert np.allclose(gp.L @ gp.L.T, K, atol=1e-10)
+    assert np.allclose(gp.L, np.tril(gp.L))
+
+def test_predict_matches_dense_posterior():
+    gp = GPAdapter(CFG)
+    rng = np.random.default_rng(1)
+    for _ in range(25):
+        gp.add(rng.random(), 0.1 + 2.4 * rng.random(), rng.integers(2))
+    Xs = rng.random((7, 2))
+    mu, sd = gp.predict(Xs, normalized=True)
+    K = gp._kernel(gp.X, gp.X) + gp.noise_var * np.eye(len(gp.y))
+    Ks = gp._kernel(gp.X, Xs)
+    m = gp.y.mean()
+    ref_mu = np.clip(m + Ks.T @ np.linalg.solve(K, gp.y - m), 0.0, 1.0)
+    ref_var = gp.signal_var - np.einsum("ij,ij->j", Ks, np.linalg.solve(K, Ks))
+    assert np.allclose(mu, ref_mu)
+    assert np.allclose(sd, np.sqrt(ref_var))
@@ -0,0 +1,56 @@
+# tests/test_mugen_runner.py
+import re, stat, sys
+import pytest
+from engine.mugen_runner import MugenRunner, READY_PATTERN
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake engine is a shell script")
+
+def fake_engine(tmp_path, body, **kwargs):
+    exe = tmp_path / "mugen.sh"
+    exe.write_text("#!/bin/sh\n" + body + "\n")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    kwargs = dict({"timeout": 2, "log_path": str(tmp_path / "mugen.log"), "prefetch": False}, **kwargs)
+    return MugenRunner(str(exe), str(tmp_path), **kwargs)
+
+def test_ready_pattern_ignores_loading_lines():
+    r = re.compile(READY_PATTERN, re.I | re.M)
+    assert not r.search("Loading data/fight.def\nfightfx.sff loaded\n")
+    assert r.search("Loading stage\nRound 1\n")
+    assert not r.search("Round 10\n")
+
+def test_startup_split_from_fight(tmp_path):
+    runner = fake_engine(tmp_path, "echo 'Loading data/fight.def' > mugen.log; sleep 0.4; "
+                                   "echo 'Round 1' >> mugen.log; sleep 0.4")
+    fight_time = runner.run_match()
+    last = runner.last
+    assert last["startup_detected"] and not last["failed"] and not last["timed_out"]
+    assert last["startup_time"] >= 0.3
+    assert fight_time < last["total_time"] - 0.3
+
+def test_no_marker_is_flagged(tmp_path):
+    runner = fake_engine(tmp_path, "echo 'Loading data/fight.def' > mugen.log; sleep 0.2")
+    runner.run_match()
+    assert runner.last["startup_detected"] is False
+
+def test_nonzero_exit_is_failed(tmp_path):
+    runner = fake_engine(tmp_path, "echo 'Round 1' > mugen.log; exit 3")
+    runner.run_match()
+    assert runner.last["failed"]
+
+def test_launch_error_is_failed(tmp_path):
+    runner = MugenRunner(str(tmp_path / "missing.exe"), str(tmp_path), prefetch=False)
+    runner.run_match()
+    assert runner.last["failed"]
+
+def test_watchdog_kills_hung_engine(tmp_path):
+    runner = fake_engine(tmp_path, "echo 'Round 1' > mugen.log; exec sleep 30")
+    runner.run_match()
+    assert runner.last["timed_out"]
+    assert runner.last["total_time"] < 10
+
+@pytest.mark.parametrize("kwargs", [{"ready_pattern": None}, {"log_path": None}])
+def test_no_log_or_pattern_returns_total_time(tmp_path, kwargs):
+    runner = fake_engine(tmp_path, "echo 'Round 1' > mugen.log; sleep 0.3", **kwargs)
+    fight_time = runner.run_match()
+    assert runner.last["startup_detected"] is False and not runner.last["failed"]
+    assert fight_time == pytest.approx(runner.last["total_time"], abs=0.05)
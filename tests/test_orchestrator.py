@@ -0,0 +1,68 @@
+# tests/test_orchestrator.py
+import pandas as pd
+import pytest
+from core.orchestrator import Orchestrator
+from ai.adaptive_boss import AdaptiveBoss
+
+class FakeRunner:
+    def __init__(self, last, fight_time=42.0):
+        self.last = dict(last)
+        self.fight_time = fight_time
+
+    def run_match(self):
+        return self.fight_time
+
+class FakeCounter:
+    count = 7
+    def start(self): pass
+    def stop(self): pass
+
+CLEAN = {"startup_time": 3.0, "startup_detected": True, "total_time": 45.0,
+         "timed_out": False, "failed": False}
+
+def make_orchestrator(tmp_path, last, **cfg_extra):
+    cns = tmp_path / "boss.cns"
+    cns.write_text("var(50) = 0.5\nvar(51) = 1.0\n", encoding="utf-8")
+    log = tmp_path / "mugen.log"
+    log.write_text("Player 1 Wins\n", encoding="utf-8")
+    paths = {"MUGEN_EXE": str(tmp_path / "mugen.exe"), "MUGEN_WORKDIR": str(tmp_path),
+             "BOSS_CNS_PATH": str(cns), "LOG_PATH": str(log),
+             "FIGHT_LOGS_CSV": str(tmp_path / "fight_logs.csv")}
+    cfg = {"ADAPTATION_MODE": "PID", "TARGET_WINRATE": 0.5, "WINDOW": 20,
+           "PREFETCH_ASSETS": False, **cfg_extra}
+    orc = Orchestrator(cfg, paths, auto_mode=True, input_counter=FakeCounter())
+    orc.runner = FakeRunner(last)
+    orc.ai = AdaptiveBoss(cfg, str(tmp_path / "state.json"))
+    return orc, paths
+
+def rows(paths):
+    try:
+        return pd.read_csv(paths["FIGHT_LOGS_CSV"])
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+def test_clean_match_is_recorded(tmp_path):
+    orc, paths = make_orchestrator(tmp_path, CLEAN)
+    orc.run_one_match()
+    df = rows(paths)
+    assert len(df) == 1 and df["fight_time"].iloc[0] == 42.0 and df["win"].iloc[0] == 1
+    assert orc.total_matches == 1
+
+def test_untimed_match_recorded_by_default(tmp_path):
+    orc, paths = make_orchestrator(tmp_path, dict(CLEAN, startup_detected=False, startup_time=None))
+    orc.run_one_match()
+    assert len(rows(paths)) == 1
+    assert orc.runner.last["startup_detected"] is False
+
+def test_untimed_match_dropped_when_opted_in(tmp_path):
+    orc, paths = make_orchestrator(tmp_path, dict(CLEAN, startup_detected=False),
+                                   DROP_UNTIMED_MATCHES=True)
+    orc.run_one_match()
+    assert len(rows(paths)) == 0 and orc.total_matches == 0
+
+@pytest.mark.parametrize("flag", ["timed_out", "failed"])
+def test_killed_or_failed_match_dropped(tmp_path, flag):
+    orc, paths = make_orchestrator(tmp_path, dict(CLEAN, **{flag: True}))
+    orc.run_one_match()
+    assert len(rows(paths)) == 0
+    assert not (tmp_path / "state.json").exists()    # no AI update either
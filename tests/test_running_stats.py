@@ -0,0 +1,100 @@
+# tests/test_running_stats.py
+import os, json
+import numpy as np
+import pandas as pd
+from data.running_stats import RunningStats, STATS_COLUMNS, stats_path
+from data.fight_data import append_row, read_stats, _read_df
+
+def make_frame(seed, n):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "timestamp": np.arange(n) + 1000,
+        "aggression": rng.random(n),
+        "reaction_time": 0.1 + 2.4 * rng.random(n),
+        "attack_inputs": rng.integers(0, 20, n),
+        "attack_rate": rng.random(n),
+        "fight_time": 30 + 60 * rng.random(n),
+        "win": rng.integers(0, 2, n),
+    })
+
+def assert_matches(stats, df):
+    ref = df[stats.columns].astype(float)
+    assert stats.n == len(df)
+    assert np.allclose(stats.mean, ref.mean().values)
+    assert np.allclose(stats.cov(), ref.cov().values)
+
+
+def test_push_matches_push_many():
+    df = make_frame(0, 40)
+    one = RunningStats()
+    for row in df.to_dict("records"):
+        one.push(row)
+    assert_matches(one, df)
+    assert_matches(RunningStats().push_many(df[STATS_COLUMNS].values), df)
+
+def test_merge_is_exact():
+    df = make_frame(1, 50)
+    parts = [RunningStats.from_frame(df.iloc[a:b]) for a, b in ((0, 7), (7, 31), (31, 50))]
+    merged = RunningStats()
+    for p in parts:
+        merged.merge(p)
+    assert_matches(merged, df)
+    assert_matches(parts[0] + parts[1] + parts[2], df)
+    assert parts[0].n == 7     # __add__ leaves its operands alone
+
+def test_corr_matches_pandas_with_constant_column():
+    df = make_frame(2, 30).assign(attack_inputs=0)
+    stats = RunningStats.from_frame(df)
+    ref = df[stats.columns].astype(float).corr().values
+    c = stats.corr()
+    assert np.array_equal(np.isnan(c), np.isnan(ref))
+    assert np.allclose(c[~np.isnan(c)], ref[~np.isnan(ref)])
+
+def test_downweighted_keeps_moments():
+    stats = RunningStats.from_frame(make_frame(3, 200))
+    small = stats.downweighted(20)
+    assert small.n == 20 and stats.n == 200
+    assert np.allclose(small.mean, stats.mean)
+    assert np.allclose(small.m2 / small.n, stats.m2 / stats.n)
+    assert stats.downweighted(500).n == 200
+
+def test_dict_round_trip():
+    stats = RunningStats.from_frame(make_frame(4, 10))
+    back = RunningStats.from_dict(stats.to_dict())
+    assert back.columns == stats.columns and back.n == stats.n
+    assert np.allclose(back.m2, stats.m2)
+
+
+def test_sidecar_seeded_from_existing_log(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    df = make_frame(5, 12)
+    df.to_csv(csv_path, index=False)
+    append_row(csv_path, make_frame(6, 1).iloc[0].to_dict())
+    assert_matches(read_stats(csv_path), _read_df(csv_path))
+
+def test_sidecar_reset_when_log_recreated(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    for row in make_frame(7, 5).to_dict("records"):
+        append_row(csv_path, row)
+    os.remove(csv_path)
+    append_row(csv_path, make_frame(8, 1).iloc[0].to_dict())
+    assert read_stats(csv_path).n == 1
+
+def test_corrupt_sidecar_is_rebuilt(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    rows = make_frame(9, 11).to_dict("records")
+    for row in rows[:10]:
+        append_row(csv_path, row)
+    with open(stats_path(csv_path), "w") as f:
+        f.write("{not json")
+    append_row(csv_path, rows[10])
+    assert_matches(read_stats(csv_path), _read_df(csv_path))
+
+def test_read_stats_rejects_sidecar_with_wrong_count(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    for row in make_frame(10, 6).to_dict("records"):
+        append_row(csv_path, row)
+    stale = RunningStats.from_frame(make_frame(11, 2))
+    with open(stats_path(csv_path), "w") as f:
+        json.dump(stale.to_dict(), f)
+    assert read_stats(csv_path, write=False).n == 6
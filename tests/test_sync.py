@@ -0,0 +1,181 @@
+# tests/test_sync.py
+import os, sys, json, time, socket, subprocess
+import numpy as np
+import pandas as pd
+from core.coordinator import Coordinator, request
+from core.sync_client import SyncClient
+from data.fight_data import REG_COLUMNS, append_row, compute_update, regression_from_stats
+from data.running_stats import RunningStats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLIENT = r"""
+import sys, json, time
+from core.sync_client import SyncClient
+cab, port, rows, expect = sys.argv[1], int(sys.argv[2]), json.loads(sys.argv[3]), int(sys.argv[4])
+c = SyncClient(cab, port=port, interval=0.05)
+for r in rows:
+    c.push(r)
+c.start()
+deadline = time.time() + 10
+while time.time() < deadline:
+    p = c.prior()
+    if p is not None and p.n == expect:
+        break
+    time.sleep(0.05)
+c.stop()
+p = c.prior()
+print(json.dumps({"n": p.n, "mean": p.mean.tolist(), "version": c.stats()["global_version"]}))
+"""
+
+def make_rows(seed, n, t0=1000):
+    rng = np.random.default_rng(seed)
+    return [{"timestamp": t0 + i, "aggression": float(rng.random()),
+             "reaction_time": float(0.1 + 2.4 * rng.random()), "attack_inputs": 0,
+             "attack_rate": float(rng.random()), "fight_time": float(30 + 60 * rng.random()),
+             "win": int(rng.integers(2))} for i in range(n)]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def cabinet_n(coord, cab):
+    reply, *_ = request("127.0.0.1", coord.port, {"op": "status"})
+    return reply["cabinets"].get(cab, {}).get("n", 0)
+
+
+def test_processes_exchange_priors():
+    coord = Coordinator(port=0).serve(block=False)
+    try:
+        rows = {"cab1": make_rows(1, 12), "cab2": make_rows(2, 20)}
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        procs = {
+            cab: subprocess.Popen(
+                [sys.executable, "-c", CLIENT, cab, str(coord.port), json.dumps(r),
+                 str(len(rows["cab2" if cab == "cab1" else "cab1"]))],
+                cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+            for cab, r in rows.items()
+        }
+        out = {cab: json.loads(p.communicate(timeout=30)[0].strip().splitlines()[-1])
+               for cab, p in procs.items()}
+        for cab, other in (("cab1", "cab2"), ("cab2", "cab1")):
+            expected = pd.DataFrame(rows[other])[REG_COLUMNS].mean().values
+            assert out[cab]["n"] == len(rows[other])
+            assert np.allclose(out[cab]["mean"], expected)
+            assert out[cab]["version"] >= 1
+        reply, *_ = request("127.0.0.1", coord.port, {"op": "status"})
+        assert reply["version"] == 2   # one push per cabinet
+    finally:
+        coord.shutdown()
+
+
+def test_lost_reply_is_not_double_counted():
+    coord = Coordinator(port=0).serve(block=False)
+    handle = coord.handle
+    slow = {"left": 1}
+    def slow_handle(msg):
+        reply = handle(msg)
+        if msg.get("op") == "push" and slow["left"]:
+            slow["left"] -= 1
+            time.sleep(0.6)     # merged on the server, reply arrives after client timeout
+        return reply
+    coord.handle = slow_handle
+    try:
+        c = SyncClient("cab1", port=coord.port, timeout=0.3)
+        for r in make_rows(3, 5):
+            c.push(r)
+        assert c.sync_once() is False
+        assert c.inflight is not None
+        c.push(make_rows(4, 1, t0=2000)[0])     # new rows wait behind the unacked batch
+        assert c.sync_once() is True
+        assert c.stats()["duplicates"] == 1
+        assert cabinet_n(coord, "cab1") == 5
+        assert c.sync_once() is True
+        assert cabinet_n(coord, "cab1") == 6
+    finally:
+        coord.shutdown()
+
+
+def test_retry_after_coordinator_comes_up():
+    port = free_port()
+    c = SyncClient("cab1", port=port, timeout=0.3)
+    for r in make_rows(5, 4):
+        c.push(r)
+    assert c.sync_once() is False
+    assert c.stats()["errors"] == 1
+    coord = Coordinator(port=port).serve(block=False)
+    try:
+        assert c.sync_once() is True
+        assert cabinet_n(coord, "cab1") == 4
+        assert c.stats()["pending_rows"] == 0
+    finally:
+        coord.shutdown()
+
+
+def test_history_seeded_once(tmp_path):
+    csv_path = str(tmp_path / "fight_logs.csv")
+    for r in make_rows(6, 9):
+        append_row(csv_path, r)
+    coord = Coordinator(port=0).serve(block=False)
+    try:
+        c = SyncClient("cab1", port=coord.port, csv_path=csv_path)
+        assert c.sync_once() is True
+        assert cabinet_n(coord, "cab1") == 9
+        assert os.path.exists(str(tmp_path / "fight_logs.sync.json"))
+
+        # restart: history is not pushed again, only the new match
+        row = make_rows(7, 1, t0=5000)[0]
+        append_row(csv_path, row)
+        c2 = SyncClient("cab1", port=coord.port, csv_path=csv_path)
+        c2.push(row)
+        assert c2.sync_once() is True
+        assert cabinet_n(coord, "cab1") == 10
+    finally:
+        coord.shutdown()
+
+
+CFG = {"LEARNING_RATE": 0.25, "TARGET_WINRATE": 0.5, "MIN_AGGR": 0.0, "MAX_AGGR": 1.0,
+       "MIN_REACTION": 0.1, "MAX_REACTION": 2.5, "WINDOW": 100, "SYNC_PRIOR_WEIGHT": 30}
+
+def pooled_prior(n=400):
+    # other cabinets: the player wins more often when the boss is slow and passive
+    rng = np.random.default_rng(11)
+    a = rng.random(n)
+    r = 0.1 + 2.4 * rng.random(n)
+    win = (rng.random(n) < 1 / (1 + np.exp(-(2 * (r - 1.3) - 2 * (a - 0.5))))).astype(float)
+    df = pd.DataFrame({"aggression": a, "reaction_time": r, "attack_rate": rng.random(n),
+                       "fight_time": 30 + 60 * rng.random(n), "win": win})
+    return RunningStats.from_frame(df, REG_COLUMNS)
+
+def expected_step(stats, means, aggr, react):
+    beta = regression_from_stats(stats)
+    pred = beta.dot([1.0, aggr, react, means.mean[2], means.mean[3]])
+    factor = CFG["LEARNING_RATE"] * (CFG["TARGET_WINRATE"] - pred) / (beta[1]**2 + beta[2]**2 + 1e-9)
+    return (np.clip(aggr + factor * beta[1], CFG["MIN_AGGR"], CFG["MAX_AGGR"]),
+            np.clip(react + factor * beta[2], CFG["MIN_REACTION"], CFG["MAX_REACTION"]))
+
+def test_cold_cabinet_without_log_uses_prior(tmp_path):
+    prior = pooled_prior()
+    csv_path = str(tmp_path / "missing.csv")
+    # no local rows: without a prior the knobs stay where they are
+    assert compute_update(csv_path, 0.5, 1.0, CFG)[:2] == (0.5, 1.0)
+    new_aggr, new_react, _ = compute_update(csv_path, 0.5, 1.0, CFG, prior=prior)
+    weighted = prior.downweighted(30)
+    assert np.allclose((new_aggr, new_react), expected_step(weighted, weighted, 0.5, 1.0))
+    assert (new_aggr, new_react) != (0.5, 1.0)
+
+def test_short_log_merges_prior_with_local_window(tmp_path):
+    prior = pooled_prior()
+    csv_path = str(tmp_path / "fight_logs.csv")
+    rows = make_rows(12, 3)
+    for r in rows:
+        append_row(csv_path, r)
+    local = RunningStats.from_frame(pd.DataFrame(rows), REG_COLUMNS)
+    merged = prior.downweighted(30) + local
+    new_aggr, new_react, win_rate = compute_update(csv_path, 0.5, 1.0, CFG, prior=prior)
+    # operating point is the local window's means, not the pooled ones
+    assert np.allclose((new_aggr, new_react), expected_step(merged, local, 0.5, 1.0))
+    assert np.isclose(win_rate, local.mean[-1])
+    # fewer than 8 local rows without a prior falls back to the small-data step
+    assert compute_update(csv_path, 0.5, 1.0, CFG)[:2] != (new_aggr, new_react)